@@ -9,9 +9,10 @@
               as used to estimate EPA city and highway mpg
 """
 
-from csv import reader
 from pkg_resources import resource_stream
 
+from numpy import loadtxt, concatenate, diff, dot, zeros
+
 # pylint: disable-msg=E0611,F0401
 from openmdao.main.api import Driver, convert_units
 from openmdao.main.datatypes.api import Float, Str
@@ -21,6 +22,52 @@ from openmdao.main.interfaces import IHasParameters, IHasObjectives, \
                                      implements
 from openmdao.util.decorators import add_delegate
 
+# Unit scale factors, resolved once at import.
+_MS2_TO_MPHS = convert_units(1.0, 'm/(s*s)', 'mi/(h*s)')
+_MIS_PER_H_TO_MI = convert_units(1.0, 'mi*s/h', 'mi')
+_L_TO_GALUS = convert_units(1.0, 'L', 'galUS')
+
+# Parsed driving profiles keyed by profile name.
+_PROFILE_CACHE = {}
+
+
+def _get_profile(profilename):
+    """ Returns the velocities, time steps, and commanded accelerations for
+    the named profile. Profiles are only read and parsed the first time
+    they are requested. The returned arrays are read-only since they are
+    shared between executions.
+    """
+    try:
+        return _PROFILE_CACHE[profilename]
+    except KeyError:
+        pass
+    
+    profile_stream = resource_stream('openmdao.examples.enginedesign',
+                                     profilename)
+    try:
+        profile = loadtxt(profile_stream, delimiter=',', ndmin=2)
+    finally:
+        profile_stream.close()
+        
+    if profile.shape[1] != 2:
+        raise ValueError("Driving profile '%s' must have two columns "
+                         "(time, velocity), found %d." %
+                         (profilename, profile.shape[1]))
+    
+    # The simulation starts from rest at time zero, so prepend that state
+    # to the profile and do the per-step arithmetic up front.
+    times = concatenate(([0.0], profile[:, 0]))
+    velocities = concatenate(([0.0], profile[:, 1]))
+    time_steps = diff(times)
+    command_accels = diff(velocities)/time_steps
+    
+    for array in (velocities, time_steps, command_accels):
+        array.setflags(write=False)
+        
+    profile = _PROFILE_CACHE[profilename] = \
+        (velocities, time_steps, command_accels)
+    return profile
+
 
 @add_delegate(HasParameters, HasObjectives)
 class SimAcceleration(Driver):
@@ -74,57 +121,72 @@ class SimAcceleration(Driver):
     def execute(self):
         """ Simulate the vehicle model at full throttle."""
         
+        # Bind the methods, objectives, and inputs used inside the simulation
+        # loop to locals to avoid repeated attribute lookups.
+        # The Parameter objects are bound directly so that each set skips
+        # the delegate call and name lookup of set_parameter_by_name.
+        parameters = self.get_parameters()
+        set_velocity = parameters['velocity'].set
+        set_throttle = parameters['throttle'].set
+        set_gear = parameters['gear'].set
+        run_iteration = self.run_iteration
+        parent = self.parent
+        objectives = self.get_objectives()
+        acceleration_obj = objectives['acceleration']
+        overspeed_obj = objectives['overspeed']
+        end_speed = self.end_speed
+        timestep = self.timestep
+        
         # Set initial throttle, gear, and velocity
         time = 0.0
         velocity = 0.0
         throttle = 1.0
         gear = 1
         
-        while velocity < self.end_speed:
+        while velocity < end_speed:
 
-            self.set_parameter_by_name('velocity', velocity)
-            self.set_parameter_by_name('throttle', throttle)
-            self.set_parameter_by_name('gear', gear)
-            self.run_iteration()
+            set_velocity(velocity, self)
+            set_throttle(throttle, self)
+            set_gear(gear, self)
+            run_iteration()
             
-            objectives = self.get_objectives()
-            acceleration = objectives['acceleration'].evaluate(self.parent)
-            overspeed = objectives['overspeed'].evaluate(self.parent)
+            acceleration = acceleration_obj.evaluate(parent)
+            overspeed = overspeed_obj.evaluate(parent)
             
             # If the next gear can produce more torque, let's shift.
             if gear < 5:
-                self.set_parameter_by_name('gear', gear+1)
-                self.run_iteration()
+                set_gear(gear+1, self)
+                run_iteration()
             
-                acceleration2 = objectives['acceleration'].evaluate(self.parent)
+                acceleration2 = acceleration_obj.evaluate(parent)
                 if acceleration2 > acceleration:
                     gear += 1
                     acceleration = acceleration2
-                    overspeed = objectives['overspeed'].evaluate(self.parent)
+                    overspeed = overspeed_obj.evaluate(parent)
                 
             
             # If RPM goes over MAX RPM, shift gears
             # (i.e.: shift at redline)
             if overspeed:
                 gear += 1
-                self.set_parameter_by_name('gear', gear)
-                self.run_iteration()
-                acceleration = objectives['acceleration'].evaluate(self.parent)
-                overspeed = objectives['overspeed'].evaluate(self.parent)
+                set_gear(gear, self)
+                run_iteration()
+                acceleration = acceleration_obj.evaluate(parent)
+                overspeed = overspeed_obj.evaluate(parent)
                 
                 if overspeed:
                     self.raise_exception("Gearing problem in Accel test.", 
                                              RuntimeError)
 
-            acceleration = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+            acceleration = acceleration*_MS2_TO_MPHS
             
             if acceleration <= 0.0:
                 self.raise_exception("Vehicle could not reach maximum speed "+\
                                      "in Acceleration test.", RuntimeError)
                 
-            velocity += (acceleration*self.timestep)
+            velocity += (acceleration*timestep)
         
-            time += self.timestep
+            time += timestep
                    
         self.accel_time = time
 
@@ -199,28 +261,92 @@ class SimEconomy(Driver):
     def execute(self):
         """ Simulate the vehicle over a velocity profile."""
         
-        # Set initial throttle, gear, and velocity
+        # Set initial throttle and gear
         throttle = 1.0
         gear = 1
-        time1 = 0.0
-        velocity1 = 0.0
         
-        profile_stream = resource_stream('openmdao.examples.enginedesign',
-                                         self.profilename)
-        profile_reader = reader(profile_stream, delimiter=',')
+        velocities, time_steps, command_accels = \
+            _get_profile(self.profilename)
+        burn_rates = zeros(len(time_steps))
+        
+        # Bind the methods, objectives, and inputs used inside the profile
+        # loop to locals to avoid repeated attribute lookups.
+        # The Parameter objects are bound directly so that each set skips
+        # the delegate call and name lookup of set_parameter_by_name.
+        parameters = self.get_parameters()
+        set_velocity = parameters['velocity'].set
+        set_throttle = parameters['throttle'].set
+        set_gear = parameters['gear'].set
+        run_iteration = self.run_iteration
+        parent = self.parent
+        objectives = self.get_objectives()
+        acceleration_obj = objectives['acceleration']
+        fuel_burn_obj = objectives['fuel_burn']
+        overspeed_obj = objectives['overspeed']
+        underspeed_obj = objectives['underspeed']
+        throttle_min = self.throttle_min
+        throttle_max = self.throttle_max
+        shiftpoint1 = self.shiftpoint1
+        tolerance = self.tolerance
         
-        distance = 0.0
-        fuelburn = 0.0
+        # Vehicle responses (acceleration, fuel burn) for each
+        # (throttle, gear) evaluated during the current profile step, so
+        # that a state that has already been run isn't run again.
+        responses = {}
         
-        self.set_parameter_by_name('gear', gear)
+        def record(throttle, gear):
+            """ Stores the Vehicle's responses for its current state."""
+            response = responses[(throttle, gear)] = \
+                (acceleration_obj.evaluate(parent)*_MS2_TO_MPHS,
+                 fuel_burn_obj.evaluate(parent))
+            return response
         
-        for row in profile_reader:
+        def probe(throttle, gear):
+            """ Returns the Vehicle's responses at the given throttle in the
+            current gear, running it only if needed."""
+            try:
+                return responses[(throttle, gear)]
+            except KeyError:
+                set_throttle(throttle, self)
+                run_iteration()
+                return record(throttle, gear)
+        
+        def findgear(gear):
+            """ Finds the nearest gear in the appropriate range for the
+            currently commanded vehicle state (throttle, velocity).
             
-            time2 = float(row[0])
-            velocity2 = float(row[1])
-            converged = 0
+            Shifts up or down one gear at a time until the engine is neither
+            overspeed nor underspeed.
+            """
+            while True:
+                
+                run_iteration()
+                
+                if overspeed_obj.evaluate(parent):
+                    gear += 1
+                    
+                    if gear > 4:
+                        self.raise_exception("Transmission gearing cannot " \
+                        "achieve acceleration and speed required by EPA " \
+                        "test.", RuntimeError)
+                    
+                elif underspeed_obj.evaluate(parent):
+                    gear -= 1
+                    
+                    # Note, no check needed for low gearing -- we allow
+                    # underspeed while in first gear.
+                        
+                else:
+                    return gear
+                    
+                set_gear(gear, self)
+        
+        set_gear(gear, self)
+        
+        for index, command_accel in enumerate(command_accels):
             
-            command_accel = (velocity2-velocity1)/(time2-time1)
+            velocity1 = velocities[index]
+            responses.clear()
             
             #------------------------------------------------------------
             # Choose the correct Gear
@@ -230,19 +356,17 @@ class SimEconomy(Driver):
             # Note: some funky gear ratios might not like this.
             # So, it's a hack for now.
             
-            if velocity1 < self.shiftpoint1:
+            if velocity1 < shiftpoint1:
                 gear = 1
-                self.set_parameter_by_name('gear', gear)
+                set_gear(gear, self)
                 
             # Find out min and max accel in current gear.
             
-            throttle = self.throttle_min
-            self.set_parameter_by_name('velocity', velocity1)
-            self.set_parameter_by_name('throttle', throttle)
-            gear = self._findgear(velocity1, throttle, gear)                    
-            objectives = self.get_objectives()
-            acceleration = objectives['acceleration'].evaluate(self.parent)
-            accel_min = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+            throttle = throttle_min
+            set_velocity(velocity1, self)
+            set_throttle(throttle, self)
+            gear = findgear(gear)
+            accel_min = record(throttle, gear)[0]
             
             # Upshift if commanded accel is less than closed-throttle accel
             # The net effect of this will often be a shift to a higher gear
@@ -250,31 +374,23 @@ class SimEconomy(Driver):
             # Note, this isn't a While loop, because we don't want to shift
             # to 5th every time we slow down.
             if command_accel < accel_min and gear < 5 and \
-               velocity1 > self.shiftpoint1:
+               velocity1 > shiftpoint1:
                 
                 gear += 1
-                self.set_parameter_by_name('gear', gear)
-                gear = self._findgear(velocity1, throttle, gear)                    
-                objectives = self.get_objectives()
-                acceleration = objectives['acceleration'].evaluate(self.parent)
-                accel_min = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+                set_gear(gear, self)
+                gear = findgear(gear)
+                accel_min = record(throttle, gear)[0]
             
-            throttle = self.throttle_max
-            self.set_parameter_by_name('throttle', throttle)
-            self.run_iteration()
-            objectives = self.get_objectives()
-            acceleration = objectives['acceleration'].evaluate(self.parent)
-            accel_max = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+            throttle = throttle_max
+            accel_max = probe(throttle, gear)[0]
             
             # Downshift if commanded accel > wide-open-throttle accel
             while command_accel > accel_max and gear > 1:
                 
                 gear -= 1
-                self.set_parameter_by_name('gear', gear)
-                gear = self._findgear(velocity1, throttle, gear)                    
-                objectives = self.get_objectives()
-                acceleration = objectives['acceleration'].evaluate(self.parent)
-                accel_max = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+                set_gear(gear, self)
+                gear = findgear(gear)
+                accel_max = record(throttle, gear)[0]
             
             # If engine cannot accelerate quickly enough to match profile, 
             # then raise exception    
@@ -288,97 +404,52 @@ class SimEconomy(Driver):
             #------------------------------------------------------------
 
             # Deceleration at closed throttle
-            throttle = self.throttle_min
-            self.set_parameter_by_name('throttle', throttle)
-            self.run_iteration()
-            objectives = self.get_objectives()
-            acceleration = objectives['acceleration'].evaluate(self.parent)
+            throttle = throttle_min
+            accel_closed = probe(throttle, gear)[0]
             
             if command_accel >= accel_min:
                 
-                min_acc = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+                min_acc = accel_closed
                 max_acc = accel_max
-                min_throttle = self.throttle_min
-                max_throttle = self.throttle_max
+                min_throttle = throttle_min
+                max_throttle = throttle_max
                 new_throttle = .5*(min_throttle + max_throttle)
                 
                 # Numerical solution to find throttle that matches accel
-                while not converged:
+                while True:
                 
                     throttle = new_throttle
-                    self.set_parameter_by_name('throttle', throttle)
-                    self.run_iteration()
-                    objectives = self.get_objectives()
-                    acceleration = objectives['acceleration'].evaluate(self.parent)
-                    new_acc = convert_units(acceleration, 'm/(s*s)', 'mi/(h*s)')
+                    new_acc = probe(throttle, gear)[0]
                     
-                    if abs(command_accel-new_acc) < self.tolerance:
-                        converged = 1
+                    if abs(command_accel-new_acc) < tolerance:
+                        break
+                    
+                    if new_acc < command_accel:
+                        min_throttle = new_throttle
+                        min_acc = new_acc
+                        step = (command_accel-min_acc)/(max_acc-new_acc)
+                        new_throttle = min_throttle + \
+                                    step*(max_throttle-min_throttle)
                     else:
-                        if new_acc < command_accel:
-                            min_throttle = new_throttle
-                            min_acc = new_acc
-                            step = (command_accel-min_acc)/(max_acc-new_acc)
-                            new_throttle = min_throttle + \
-                                        step*(max_throttle-min_throttle)
-                        else:
-                            max_throttle = new_throttle
-                            step = (command_accel-min_acc)/(new_acc-min_acc)
-                            new_throttle = min_throttle + \
-                                        step*(max_throttle-min_throttle)
-                            max_acc = new_acc
+                        max_throttle = new_throttle
+                        step = (command_accel-min_acc)/(new_acc-min_acc)
+                        new_throttle = min_throttle + \
+                                    step*(max_throttle-min_throttle)
+                        max_acc = new_acc
                       
-            distance += .5*(velocity2+velocity1)*(time2-time1)
-            burn_rate = objectives['fuel_burn'].evaluate(self.parent)
-            fuelburn += burn_rate*(time2-time1)
-            
-            velocity1 = velocity2
-            time1 = time2
+            burn_rates[index] = responses[(throttle, gear)][1]
             
-            #print "T = %f, V = %f, Acc = %f" % (time1, velocity1, 
-            #command_accel)
+            #print "V = %f, Acc = %f" % (velocities[index+1], command_accel)
             #print gear, accel_min, accel_max
             
+        # Trapezoidal distance and rectangular fuel burn over each step.
+        distance = .5*dot(velocities[1:] + velocities[:-1], time_steps)
+        fuelburn = dot(burn_rates, time_steps)
+        
         # Convert liter to gallon and sec/hr to hr/hr
-        distance = convert_units(distance, 'mi*s/h', 'mi')
-        fuelburn = convert_units(fuelburn, 'L', 'galUS')
+        distance = distance*_MIS_PER_H_TO_MI
+        fuelburn = fuelburn*_L_TO_GALUS
         self.fuel_economy = distance/fuelburn
-        
-       
-    def _findgear(self, velocity, throttle, gear):
-        """ Finds the nearest gear in the appropriate range for the
-        currently commanded vehicle state (throttle, velocity).
-        
-        This is intended to be called recursively.
-        """
-
-        self.run_iteration()
-        
-        objectives = self.get_objectives()
-        overspeed = objectives['overspeed'].evaluate(self.parent)
-        underspeed = objectives['underspeed'].evaluate(self.parent)
-        
-        if overspeed:
-            gear += 1
-            
-            if gear > 4:
-                self.raise_exception("Transmission gearing cannot " \
-                "achieve acceleration and speed required by EPA " \
-                "test.", RuntimeError)
-            
-        elif underspeed:
-            gear -= 1
-            
-            # Note, no check needed for low gearing -- we allow underspeed 
-            # while in first gear.
-                
-        else:
-            return gear
-            
-        self.set_parameter_by_name('gear', gear)
-        gear = self._findgear(velocity, throttle, gear)        
-
-        return gear
 
 if __name__ == "__main__": # pragma: no cover
     
@@ -392,51 +463,60 @@ if __name__ == "__main__": # pragma: no cover
     top.add('sim_acc', SimAcceleration())
     top.add('sim_EPA_city', SimEconomy())
     top.add('sim_EPA_highway', SimEconomy())
-    top.add('vehicle', Vehicle())
+    
+    # Each sim gets its own Vehicle so that the three sims share no state
+    # and can be run concurrently.
+    top.add('vehicle_acc', Vehicle())
+    top.add('vehicle_city', Vehicle())
+    top.add('vehicle_highway', Vehicle())
     
     top.driver.workflow.add('sim_acc')
     top.driver.workflow.add('sim_EPA_city')
     top.driver.workflow.add('sim_EPA_highway')
     
-    # Add vehicle to sim workflows.
-    top.sim_acc.workflow.add('vehicle')
-    top.sim_EPA_city.workflow.add('vehicle')
-    top.sim_EPA_highway.workflow.add('vehicle')    
+    # The sims are independent, so run them in parallel when under MPI.
+    # (This is ignored, and they run serially, otherwise.)
+    top.driver.system_type = 'parallel'
+    
+    # Add vehicles to sim workflows.
+    top.sim_acc.workflow.add('vehicle_acc')
+    top.sim_EPA_city.workflow.add('vehicle_city')
+    top.sim_EPA_highway.workflow.add('vehicle_highway')
     
     # Acceleration Sim setup
-    top.sim_acc.add_parameter('vehicle.velocity', name='velocity',
+    top.sim_acc.add_parameter('vehicle_acc.velocity', name='velocity',
                               low=0.0, high=150.0)
-    top.sim_acc.add_parameter('vehicle.throttle', name='throttle',
+    top.sim_acc.add_parameter('vehicle_acc.throttle', name='throttle',
                               low=0.01, high=1.0)
-    top.sim_acc.add_parameter('vehicle.current_gear', name='gear',
+    top.sim_acc.add_parameter('vehicle_acc.current_gear', name='gear',
                               low=0, high=5)
-    top.sim_acc.add_objective('vehicle.acceleration', name='acceleration')
-    top.sim_acc.add_objective('vehicle.overspeed', name='overspeed')
+    top.sim_acc.add_objective('vehicle_acc.acceleration', name='acceleration')
+    top.sim_acc.add_objective('vehicle_acc.overspeed', name='overspeed')
     
     # EPA City MPG Sim Setup
-    top.sim_EPA_city.add_parameter('vehicle.velocity', name='velocity',
+    top.sim_EPA_city.add_parameter('vehicle_city.velocity', name='velocity',
                               low=0.0, high=150.0)
-    top.sim_EPA_city.add_parameter('vehicle.throttle', name='throttle',
+    top.sim_EPA_city.add_parameter('vehicle_city.throttle', name='throttle',
                               low=0.01, high=1.0)
-    top.sim_EPA_city.add_parameter('vehicle.current_gear', name='gear',
+    top.sim_EPA_city.add_parameter('vehicle_city.current_gear', name='gear',
                               low=0, high=5)
-    top.sim_EPA_city.add_objective('vehicle.acceleration', name='acceleration')
-    top.sim_EPA_city.add_objective('vehicle.fuel_burn', name='fuel_burn')
-    top.sim_EPA_city.add_objective('vehicle.overspeed', name='overspeed')
-    top.sim_EPA_city.add_objective('vehicle.underspeed', name='underspeed')
+    top.sim_EPA_city.add_objective('vehicle_city.acceleration', name='acceleration')
+    top.sim_EPA_city.add_objective('vehicle_city.fuel_burn', name='fuel_burn')
+    top.sim_EPA_city.add_objective('vehicle_city.overspeed', name='overspeed')
+    top.sim_EPA_city.add_objective('vehicle_city.underspeed', name='underspeed')
     top.sim_EPA_city.profilename = 'EPA-city.csv'
     
     # EPA Highway MPG Sim Setup
-    top.sim_EPA_highway.add_parameter('vehicle.velocity', name='velocity',
+    top.sim_EPA_highway.add_parameter('vehicle_highway.velocity', name='velocity',
                               low=0.0, high=150)
-    top.sim_EPA_highway.add_parameter('vehicle.throttle', name='throttle',
+    top.sim_EPA_highway.add_parameter('vehicle_highway.throttle', name='throttle',
                               low=0.01, high=1.0)
-    top.sim_EPA_highway.add_parameter('vehicle.current_gear', name='gear',
+    top.sim_EPA_highway.add_parameter('vehicle_highway.current_gear', name='gear',
                               low=0, high=5)
-    top.sim_EPA_highway.add_objective('vehicle.acceleration', name='acceleration')
-    top.sim_EPA_highway.add_objective('vehicle.fuel_burn', name='fuel_burn')
-    top.sim_EPA_highway.add_objective('vehicle.overspeed', name='overspeed')
-    top.sim_EPA_highway.add_objective('vehicle.underspeed', name='underspeed')
+    top.sim_EPA_highway.add_objective('vehicle_highway.acceleration', name='acceleration')
+    top.sim_EPA_highway.add_objective('vehicle_highway.fuel_burn', name='fuel_burn')
+    top.sim_EPA_highway.add_objective('vehicle_highway.overspeed', name='overspeed')
+    top.sim_EPA_highway.add_objective('vehicle_highway.underspeed', name='underspeed')
     top.sim_EPA_highway.profilename = 'EPA-highway.csv'        
     
     top.run()
@@ -9,6 +9,13 @@
 from openmdao.main.api import Component, convert_units
 from openmdao.main.datatypes.api import Float, Int, Enum
 
+# Vehicle velocity is converted from mi/h to inch/min every execution; the
+# conversion is a pure scale factor, so resolve it once.
+_MPH_TO_INCH_PER_MIN = convert_units(1.0, 'mi/h', 'inch/min')
+
+# Name of the gear ratio input for each gear position (neutral has none).
+_RATIO_NAMES = (None, 'ratio1', 'ratio2', 'ratio3', 'ratio4', 'ratio5')
+
 
 class Transmission(Component):
     """ A simple transmission model."""
@@ -63,17 +70,19 @@ class Transmission(Component):
         """ The 5-speed manual transmission is simulated by determining the
         torque output and engine RPM via the gear ratios.
         """
-        ratios = [0.0, self.ratio1, self.ratio2, self.ratio3, self.ratio4,
-                  self.ratio5]
-        
         gear = self.current_gear
+        if gear:
+            ratio = getattr(self, _RATIO_NAMES[gear])
+        else:
+            ratio = 0.0
+        
         differential = self.final_drive_ratio
         tire_circ = self.tire_circ
-        velocity = convert_units(self.velocity, 'mi/h', 'inch/min')
+        velocity = self.velocity*_MPH_TO_INCH_PER_MIN
         
-        self.RPM = (ratios[gear]*differential \
+        self.RPM = (ratio*differential \
                     *velocity)/(tire_circ)
-        self.torque_ratio = ratios[gear]*differential
+        self.torque_ratio = ratio*differential
             
         # At low speeds, hold engine speed at 1000 RPM and
         # partially engage clutch
@@ -8,6 +8,7 @@ import shutil
 import urllib2
 import subprocess
 import codecs
+from contextlib import closing
 from optparse import OptionParser
 
 
@@ -36,9 +37,10 @@ def make_new_setupfile(setupfile):
         print "setuptools is not installed."
         if not os.path.isfile('ez_setup.py'):
             print "Attempting to download ez_setup.py"
-            resp = urllib2.urlopen('http://peak.telecommunity.com/dist/ez_setup.py')
-            with open('ez_setup.py', 'wb') as easyf:
-                shutil.copyfileobj(resp.fp, easyf)
+            url = 'http://peak.telecommunity.com/dist/ez_setup.py'
+            with closing(urllib2.urlopen(url)) as resp:
+                with open('ez_setup.py', 'wb') as easyf:
+                    shutil.copyfileobj(resp, easyf, 65536)
             print 'successfully downloaded ez_setup.py'
 
         print "Attempting to update %s to import from ez_setup" % setupfile
@@ -46,14 +48,11 @@ def make_new_setupfile(setupfile):
         if not os.path.isfile(setupfile):
             raise IOError("can't find setup file '%s'" % setupfile)
         
-        setupf = open(setupfile, 'r')
-        setup_contents = setupf.read()
-        setupf.close()
-        
-        with open(newsetupfile, 'wb') as newf:
-            newf.write("from ez_setup import use_setuptools\n")
-            newf.write("use_setuptools(download_delay=0)\n\n")
-            newf.write(setup_contents)
+        with open(setupfile, 'r') as setupf:
+            with open(newsetupfile, 'wb') as newf:
+                newf.write("from ez_setup import use_setuptools\n")
+                newf.write("use_setuptools(download_delay=0)\n\n")
+                shutil.copyfileobj(setupf, newf)
     finally:
         os.chdir(startdir)
         
@@ -102,10 +101,7 @@ def build_dist(srcdir, destdir='.', build_type='bdist_egg'):
     
     print 'running command: %s' % ' '.join(cmd)
     try:
-        p = subprocess.Popen(' '.join(cmd), 
-                             stdout=out, stderr=subprocess.STDOUT,
-                             shell=True)
-        p.wait()
+        retcode = subprocess.call(cmd, stdout=out, stderr=subprocess.STDOUT)
     finally:
         out.close()
         with open('_build_.out', 'r') as f:
@@ -116,9 +112,9 @@ def build_dist(srcdir, destdir='.', build_type='bdist_egg'):
     if len(newfiles) != 1:
         raise RuntimeError("expected one new file in in destination directory but found %s" % 
                            list(newfiles))
-    if p.returncode != 0:
+    if retcode != 0:
         raise RuntimeError("problem building distribution in %s. (return code = %s)" %
-                           (srcdir, p.returncode))
+                           (srcdir, retcode))
     
     distfile = os.path.join(destdir, newfiles.pop())
     print 'new distribution file is %s' % distfile
@@ -6,7 +6,9 @@ __all__ = ["ExprEvaluator"]
 import weakref
 import math
 import ast
+import re
 import __builtin__
+from keyword import iskeyword
 
 from openmdao.main.printexpr import _get_attr_node, _get_long_name, \
                                     transform_expression, ExprPrinter, \
@@ -60,6 +62,19 @@ from openmdao.main.mp_support import has_interface
 
 _Missing = object()
 
+_simple_name_rgx = re.compile(r'[A-Za-z_]\w*(\.[A-Za-z_]\w*)*\Z')
+
+def _is_simple_name(text):
+    """Return True if text is just a variable name, possibly dotted."""
+    return _simple_name_rgx.match(text) is not None and \
+           not any(iskeyword(part) for part in text.split('.'))
+
+# Compiled code for translated expressions, keyed by (text, getter,
+# translated names). Translation depends on the scope only through which
+# names get routed to the scope, so this key determines the code exactly.
+_code_cache = {}
+_CODE_CACHE_MAX = 5000
+
 def find_dotted(scope, vname):
     """Return the object corresponding to the given name in the given
     scope. Returns _Missing if object is not found.
@@ -79,14 +94,17 @@ def in_expr_locals(scope, name):
     Returns False if the name refers to nothing in _expr_dict,
     e.g., mycomp.x.
     """
-    if hasattr(scope, name):
-        return False
-    if hasattr(__builtin__, name) or name == '_local_setter_':
-        return True
     parts = name.split('.')
     obj = _expr_dict.get(parts[0], _Missing)
-    if obj is _Missing:
+    is_builtin = hasattr(__builtin__, name) or name == '_local_setter_'
+    # Most names are model variables that can't be locals no matter what
+    # the scope contains, so rule those out before probing the scope.
+    if obj is _Missing and not is_builtin:
         return False
+    if hasattr(scope, name):
+        return False
+    if is_builtin:
+        return True
     for part in parts[1:]:
         obj = getattr(obj, part, _Missing)
         if obj is _Missing:
@@ -139,6 +157,9 @@ class ExprTransformer(ast.NodeTransformer):
                           # brackets so that we always translate to 'get'
                           # even if we're on the lhs
         self.getter = getter
+        self.translated = []  # names routed to scope, in visit order
+        self._scope = expreval.scope
+        self._is_local = {}  # in_expr_locals results, by name
         super(ExprTransformer, self).__init__()
 
     def visit(self, node, subs=None):
@@ -157,11 +178,17 @@ class ExprTransformer(ast.NodeTransformer):
         if name is None:
             return super(ExprTransformer, self).generic_visit(node)
 
-        if in_expr_locals(self.expreval.scope, name):
+        # the same name often appears several times in one expression, so
+        # only resolve it against the scope once
+        is_local = self._is_local.get(name)
+        if is_local is None:
+            is_local = self._is_local[name] = in_expr_locals(self._scope,
+                                                             name)
+        if is_local:
             return node
 
         names = ['scope']
-        self.expreval.var_names.add(name.split('[',1)[0].split('(',1)[0])
+        self.translated.append(name)
 
         args = [ast.Str(s=name)]
         if self.rhs and len(self._stack) == 0:
@@ -206,7 +233,9 @@ class ExprTransformer(ast.NodeTransformer):
             raise RuntimeError("only one expression is allowed on left hand"
                                " side of assignment")
         rhs = self.visit(node.value)
-        lhs = ExprTransformer(self.expreval, rhs=rhs).visit(node.targets[0])
+        lhs_xform = ExprTransformer(self.expreval, rhs=rhs)
+        lhs = lhs_xform.visit(node.targets[0])
+        self.translated.extend(lhs_xform.translated)
         if isinstance(lhs, (ast.Name, ast.Subscript, ast.Attribute)):
             lhs.ctx = ast.Store()
             return ast.Assign(targets=[lhs], value=rhs)
@@ -315,7 +344,7 @@ class ExprExaminer(ast.NodeVisitor):
     visit_Mod        = _no_assign
     visit_Pow        = _no_assign
     visit_LShift     = _no_assign
-    visit_Rshift     = _no_assign
+    visit_RShift     = _no_assign
     visit_BitOr      = _no_assign
     visit_BitXor     = _no_assign
     visit_BitAnd     = _no_assign
@@ -347,13 +376,21 @@ class ExprEvaluator(object):
     ``openmdao.main.index.process_index_entry`` function.
     """
 
+    # Models hold large numbers of these, so don't give each one a __dict__.
+    # Subclasses that don't define __slots__ still get one.
+    _state_attrs = ('_scope', '_text', 'getter', 'var_names', 'cached_grad_eq',
+                    '_get_path', '_code', '_assignment_code', '_examiner',
+                    '_allow_set')
+    __slots__ = _state_attrs + ('__weakref__',)
+
     def __init__(self, text, scope=None, getter='get'):
         self._scope = None
         self.scope = scope
         self.text = text
         self.getter = getter
-        self.var_names = set()
+        self.var_names = frozenset()
         self.cached_grad_eq = None
+        self._get_path = None
 
     @property
     def text(self):
@@ -451,7 +488,9 @@ class ExprEvaluator(object):
 
     def __getstate__(self):
         """Return dict representing this container's state."""
-        state = self.__dict__.copy()
+        state = dict((name, getattr(self, name))
+                     for name in self._state_attrs if hasattr(self, name))
+        state.update(getattr(self, '__dict__', {}))
         # remove weakref to scope because it won't pickle
         state['_scope'] = self.scope
         state['_code'] = None  # <type 'code'> won't pickle either.
@@ -462,7 +501,8 @@ class ExprEvaluator(object):
 
     def __setstate__(self, state):
         """Restore this component's state."""
-        self.__dict__.update(state)
+        for name, value in state.iteritems():
+            setattr(self, name, value)
         if self._scope is not None:
             self._scope = weakref.ref(self._scope)
 
@@ -483,17 +523,51 @@ class ExprEvaluator(object):
         return root
 
     def _parse_get(self):
-        astree = self._pre_parse()
-
-        new_ast = ExprTransformer(self, getter=self.getter).visit(astree)
-
-        # compile the transformed AST
+        text = self.text
+        if _is_simple_name(text) and not in_expr_locals(self.scope, text):
+            # A lone variable name always translates to a single get() call,
+            # so build that directly rather than parsing and transforming.
+            self._allow_set = True
+            new_ast = ast.Expression(
+                body=ast.Call(func=_get_attr_node(['scope', self.getter]),
+                              args=[ast.Str(s=text)], keywords=[]))
+            translated = (text,)
+        else:
+            astree = self._pre_parse()
+            xform = ExprTransformer(self, getter=self.getter)
+            new_ast = xform.visit(astree)
+            translated = tuple(xform.translated)
+
+        # If the whole expression is a single get() of one path, evaluate()
+        # can make that call itself instead of going through eval().
+        self._get_path = None
+        if len(translated) == 1 and isinstance(new_ast, ast.Expression):
+            body = new_ast.body
+            if isinstance(body, ast.Call) and len(body.args) == 1 and \
+               not body.keywords and isinstance(body.args[0], ast.Str) and \
+               body.args[0].s == translated[0] and \
+               isinstance(body.func, ast.Attribute) and \
+               isinstance(body.func.value, ast.Name) and \
+               body.func.value.id == 'scope':
+                self._get_path = translated[0]
+
+        # compile the transformed AST, unless an identical translation has
+        # already been compiled
         ast.fix_missing_locations(new_ast)
-        mode = 'exec' if isinstance(new_ast, ast.Module) else 'eval'
-        return (new_ast, compile(new_ast, self.text, mode))
+        self.var_names = frozenset([name.split('[', 1)[0].split('(', 1)[0]
+                                    for name in translated])
+        key = (text, self.getter, translated)
+        code = _code_cache.get(key)
+        if code is None:
+            mode = 'exec' if isinstance(new_ast, ast.Module) else 'eval'
+            code = compile(new_ast, text, mode)
+            if len(_code_cache) >= _CODE_CACHE_MAX:
+                _code_cache.clear()
+            _code_cache[key] = code
+        return (new_ast, code)
 
     def _parse(self):
-        self.var_names = set()
+        self.var_names = frozenset()
         try:
             new_ast, self._code = self._parse_get()
         except SyntaxError as err:
@@ -503,7 +577,8 @@ class ExprEvaluator(object):
 
     def _get_updated_scope(self, scope):
         if scope is not None:
-            self.scope = scope
+            if self._scope is None or self._scope() is not scope:
+                self.scope = scope
             return scope
         return self.scope
 
@@ -513,13 +588,17 @@ class ExprEvaluator(object):
         """
         if scope is None:
             scope = self.scope
-        else:
+        elif self._scope is None or self._scope() is not scope:
+            # only go through the setter (and drop the compiled code) when
+            # the scope actually changes, since drivers pass it every time
             self.scope = scope
 
         try:
             if self._code is None:
                 self._parse()
-            return eval(self._code, _expr_dict, locals())
+            if self._get_path is not None:
+                return getattr(scope, self.getter)(self._get_path)
+            return eval(self._code, _expr_dict, {'scope': scope})
         except Exception, err:
             raise type(err)("can't evaluate expression "
                             "'%s': %s" % (self.text, str(err)))
@@ -554,7 +633,7 @@ class ExprEvaluator(object):
         else:
             var_dict[target_var] += 0.5*stepsize
 
-        yp = eval(grad_code, _expr_dict, locals())
+        yp = eval(grad_code, _expr_dict, {'var_dict': var_dict})
 
         if(isinstance(yp, ndarray)):
             yp = yp.flatten()
@@ -564,7 +643,7 @@ class ExprEvaluator(object):
         else:
             var_dict[target_var] -= stepsize
 
-        ym = eval(grad_code, _expr_dict, locals())
+        ym = eval(grad_code, _expr_dict, {'var_dict': var_dict})
 
         if isinstance(ym, ndarray):
             ym = ym.flatten()
@@ -582,7 +661,7 @@ class ExprEvaluator(object):
         else:
             var_dict[target_var] += stepsize * 1j
 
-        yp = eval(grad_code, _expr_dict, locals())
+        yp = eval(grad_code, _expr_dict, {'var_dict': var_dict})
 
         if(isinstance(yp, ndarray)):
             yp = yp.flatten()
@@ -621,11 +700,10 @@ class ExprEvaluator(object):
         var_dict = {}
         new_names = {}
         for name in inputs:
-            if '[' in name:
-                new_expr = ExprEvaluator(name, scope)
-                replace_val = new_expr.evaluate()
-            else:
-                replace_val = scope.get(name)
+            # refs are already in the printed form that ExprTransformer
+            # passes to get(), including any array index, so there's no need
+            # to parse them again.
+            replace_val = scope.get(name)
 
             if isinstance(replace_val, ndarray):
                 replace_val = replace_val.astype(numpy.complex)
@@ -657,7 +735,7 @@ class ExprEvaluator(object):
 
             val = var_dict[var]
             if isinstance(val, ndarray):
-                yp = eval(grad_code, _expr_dict, locals())
+                yp = eval(grad_code, _expr_dict, {'var_dict': var_dict})
 
                 if isinstance(yp, ndarray):
                     gradient[var] = zeros((yp.size, val.size))
@@ -747,7 +825,7 @@ class ExprEvaluator(object):
             return self.refs(copy)
         else:
             if copy:
-                return self.var_names.copy()
+                return set(self.var_names)
             else:
                 return self.var_names
 
@@ -779,7 +857,7 @@ class ExprEvaluator(object):
             scope = self.scope
             if scope:
                 return [n for n in self.var_names if not scope.contains(n)]
-            return self.var_names.copy()
+            return set(self.var_names)
         return []
 
     def name_changed(self, old, new):
@@ -818,9 +896,20 @@ class ConnectedExprEvaluator(ExprEvaluator):
             del kwargs['is_dest']
         super(ConnectedExprEvaluator, self).__init__(*args, **kwargs)
 
+    def _pre_parse(self):
+        root = super(ConnectedExprEvaluator, self)._pre_parse()
+        # Examine the tree before ExprTransformer rewrites it in place, so
+        # the text doesn't have to be parsed a second time for the examiner.
+        if isinstance(root, ast.Expression):
+            self._examiner = ExprExaminer(root, self)
+        return root
+
     def _parse(self):
+        self._examiner = None
         super(ConnectedExprEvaluator, self)._parse()
-        self._examiner = ExprExaminer(ast.parse(self.text, mode='eval'), self)
+        if self._examiner is None:
+            self._examiner = ExprExaminer(ast.parse(self.text, mode='eval'),
+                                          self)
         if self._is_dest:
             if not self._examiner.const_indices:
                 raise RuntimeError("bad destination expression '%s': only"
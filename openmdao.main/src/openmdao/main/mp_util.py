@@ -29,6 +29,9 @@ from openmdao.util.shellproc import ShellProc, STDOUT, PIPE
 # Names of attribute access methods requiring special handling.
 SPECIALS = ('__getattribute__', '__getattr__', '__setattr__', '__delattr__')
 
+# Current user, used as the default for ssh tunnels.
+_CURRENT_USER = getpass.getuser()
+
 
 # Mapping from remote addresses to local tunnel addresses.
 _TUNNEL_MAP = {}
@@ -247,7 +250,7 @@ def _unused_remote_port(address, port, user, identity):
     if '@' in address:
         user, host = address.split('@')
     else:
-        user = user or getpass.getuser()
+        user = user or _CURRENT_USER
         host = address
 
     if sys.platform == 'win32':  # pragma no cover
@@ -294,7 +297,7 @@ def _start_tunnel(address, port, args, user, identity, prefix):
     if '@' in address:
         user, host = address.split('@')
     else:
-        user = user or getpass.getuser()
+        user = user or _CURRENT_USER
         host = address
 
     if sys.platform == 'win32':  # pragma no cover
@@ -881,15 +881,25 @@ def build_docs_and_install(owner, name, version, findlinks):  # pragma no cover
 
         # install dependencies (some may be needed by sphinx)
         ws = WorkingSet()
+        missing = []
         for r in reqs:
             print "Installing dependency '%s'" % r
             req = Requirement.parse(r)
             dist = ws.find(req)
             if dist is None:
-                try:
-                    check_call(['easy_install', '-Z', '-f', findlinks, r])
-                except Exception:
-                    traceback.print_exc()
+                missing.append(r)
+
+        if missing:
+            try:
+                check_call(['easy_install', '-Z', '-f', findlinks] + missing)
+            except Exception:
+                # retry one at a time so that one bad dependency doesn't
+                # keep the rest from being installed
+                for r in missing:
+                    try:
+                        check_call(['easy_install', '-Z', '-f', findlinks, r])
+                    except Exception:
+                        traceback.print_exc()
 
         # build sphinx docs
         check_call(['plugin', 'build_docs', files[0]])
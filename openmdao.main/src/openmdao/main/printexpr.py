@@ -83,6 +83,23 @@ _op_preds[ast.Invert] = _prec
 _prec += 1
 _op_preds[ast.Pow] = _prec
 
+# text for each binary operator, so that printing a BinOp doesn't have to
+# dispatch through the visitor just to emit its operator
+_binop_text = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.Mod: '%',
+    ast.Pow: '**',
+    ast.LShift: '<<',
+    ast.RShift: '>>',
+    ast.BitOr: '|',
+    ast.BitXor: '^',
+    ast.BitAnd: '&',
+    ast.FloorDiv: '//',
+}
+
 def _pred_cmp(op1, op2):
     """Used to determine operator precedence."""
     return _op_preds[op1.__class__] - _op_preds[op2.__class__]
@@ -131,7 +148,7 @@ class ExprPrinter(ast.NodeVisitor):
             self.append(')')
         else:
             self.visit(node.left)
-        self.visit(node.op)
+        self.append(_binop_text[node.op.__class__])
         if isinstance(node.right, ast.BinOp):
             pred_comp = _pred_cmp(node.right.op, node.op)
             # Subtraction isn't commutative, so when the operator precedence
@@ -248,20 +265,6 @@ class ExprPrinter(ast.NodeVisitor):
     def visit_And(self, node):  self.append(' and ')
     def visit_Or(self, node):   self.append(' or ')
 
-    # operators
-    def visit_Add(self, node):      self.append('+')
-    def visit_Sub(self, node):      self.append('-')
-    def visit_Mult(self, node):     self.append('*')
-    def visit_Div(self, node):      self.append('/')
-    def visit_Mod(self, node):      self.append('%')
-    def visit_Pow(self, node):      self.append('**')
-    def visit_LShift(self, node):   self.append('<<')
-    def visit_Rshift(self, node):   self.append('>>')
-    def visit_BitOr(self, node):    self.append('|')
-    def visit_BitXor(self, node):   self.append('^')
-    def visit_BitAnd(self, node):   self.append('&')
-    def visit_FloorDiv(self, node): self.append('//')
-
     # cmp operators
     def visit_Eq(self, node):    self.append('==')
     def visit_NotEq(self, node): self.append('!=')
@@ -48,6 +48,9 @@ from openmdao.util.publickey import get_key_pair, HAVE_PYWIN32, \
 # Verified credentials keyed by encoding tuple.
 _VERIFY_CACHE = {}
 
+# Local (key_pair, public_key, data, signature) keyed by user_host.
+_SIGN_CACHE = {}
+
 
 class CredentialsError(Exception):
     """ Raised when decoding/verifying received credentials. """
@@ -103,11 +106,19 @@ class Credentials(object):
             self.user = Credentials.user_host
             self.transient = (sys.platform == 'win32') and not HAVE_PYWIN32
             key_pair = get_key_pair(self.user)
-            self.public_key = key_pair.publickey()
-            self.data = '\n'.join([self.user, str(int(self.transient)),
-                                   self.public_key.exportKey()])
-            hash = hashlib.sha256(self.data).digest()
-            self.signature = pk_sign(hash, key_pair)
+            # Signing is expensive and only depends on the key pair, so
+            # reuse the previous result unless the key pair has changed.
+            cached = _SIGN_CACHE.get(self.user)
+            if cached is not None and cached[0] is key_pair:
+                self.public_key, self.data, self.signature = cached[1:]
+            else:
+                self.public_key = key_pair.publickey()
+                self.data = '\n'.join([self.user, str(int(self.transient)),
+                                       self.public_key.exportKey()])
+                hash = hashlib.sha256(self.data).digest()
+                self.signature = pk_sign(hash, key_pair)
+                _SIGN_CACHE[self.user] = (key_pair, self.public_key,
+                                          self.data, self.signature)
             self.client_creds = None
         else:
             # Recreate remote user credentials.
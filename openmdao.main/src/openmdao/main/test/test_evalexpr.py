@@ -103,6 +103,8 @@ class ExprPrinterTestCase(unittest.TestCase):
             'a/b',
             'a-(b-c)',
             'a+b*c',
+            'a<<b',
+            'a>>b',
             'a[0]',
             'a[0::]',
             'a[:0:]',
@@ -322,6 +324,83 @@ class ExprEvalTestCase(unittest.TestCase):
         else:
             self.fail("Exception expected")
 
+    def test_shared_code(self):
+        ex1 = ExprEvaluator('comp.x+math.floor(a.f)', self.top)
+        ex2 = ExprEvaluator('comp.x+math.floor(a.f)', self.top)
+        self.top.a.f = 2.5
+        self.assertEqual(ex1.evaluate(), 3.14+2.)
+        self.assertEqual(ex2.evaluate(), 3.14+2.)
+        self.assertTrue(ex1._code is ex2._code)
+
+    def test_simple_name(self):
+        # a lone dotted name skips the transformer but must behave the same
+        ex = ExprEvaluator('comp.x', self.top)
+        self.assertEqual(new_text(ex), "scope.get('comp.x')")
+        self.assertEqual(ex.evaluate(), 3.14)
+        self.assertEqual(ex.is_valid_assignee(), True)
+        self.assertEqual(ex.var_names, frozenset(['comp.x']))
+        self.assertEqual(ex.refs(), set(['comp.x']))
+        ex.set(2.5)
+        self.assertEqual(self.top.comp.x, 2.5)
+
+        # expr locals are left for eval() to resolve
+        ex = ExprEvaluator('math.pi', self.top)
+        self.assertEqual(new_text(ex), 'math.pi')
+        self.assertEqual(ex.evaluate(), math.pi)
+        self.assertEqual(ex.var_names, frozenset())
+
+        ex = ConnectedExprEvaluator('a.a1d', self.top,
+                                    getter='get_attr_w_copy')
+        self.assertEqual(new_text(ex), "scope.get_attr_w_copy('a.a1d')")
+        val = ex.evaluate()
+        self.assertEqual(list(val), [1., 2., 3., 4., 5., 6.])
+        self.assertEqual(ex.refs(), set(['a.a1d']))
+
+        ex = ConnectedExprEvaluator('comp.x', self.top,
+                                    getter='get_attr_w_copy', is_dest=True)
+        ex._parse()
+        self.assertEqual(ex.is_valid_assignee(), True)
+        self.assertEqual(ex.refs(), set(['comp.x']))
+
+    def test_get_path(self):
+        # expressions that are a single get() call bypass eval()
+        ex = ExprEvaluator('comp.x', self.top)
+        self.assertEqual(ex.evaluate(), 3.14)
+        self.assertEqual(ex._get_path, 'comp.x')
+
+        ex = ExprEvaluator('a.a1d[1]', self.top)
+        self.assertEqual(ex.evaluate(), 2.)
+        self.assertEqual(ex._get_path, 'a.a1d[1]')
+
+        ex = ExprEvaluator('comp.x+1', self.top)
+        self.assertEqual(ex.evaluate(), 3.14+1)
+        self.assertEqual(ex._get_path, None)
+
+        ex = ExprEvaluator('comp.x = comp.y', self.top)
+        ex.evaluate()
+        self.assertEqual(self.top.comp.x, 42.)
+        self.assertEqual(ex._get_path, None)
+
+        # changing the text drops the shortcut
+        ex = ExprEvaluator('comp.x', self.top)
+        self.assertEqual(ex.evaluate(), 42.)
+        ex.text = 'comp.x+1'
+        self.assertEqual(ex.evaluate(), 43.)
+        self.assertEqual(ex._get_path, None)
+        ex.text = 'comp.y'
+        self.assertEqual(ex.evaluate(), 42.)
+        self.assertEqual(ex._get_path, 'comp.y')
+
+        # so does changing to a scope where the name means something else
+        self.top.a.pi = 2.5
+        ex = ExprEvaluator('pi', self.top.comp)
+        self.assertEqual(ex.evaluate(), math.pi)
+        self.assertEqual(ex._get_path, None)
+        self.assertEqual(ex.evaluate(self.top.a), 2.5)
+        self.assertEqual(ex._get_path, 'pi')
+        self.assertEqual(ex.evaluate(self.top.comp), math.pi)
+        self.assertEqual(ex._get_path, None)
+
     def test_property(self):
         ex = ExprEvaluator('some_prop', self.top.a)
         self.assertEqual(ex.evaluate(), 7)
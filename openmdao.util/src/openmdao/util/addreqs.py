@@ -8,6 +8,8 @@ import os
 import urllib2
 from optparse import OptionParser
 import subprocess
+from collections import OrderedDict
+from contextlib import closing
 
 
 # requirements files have the following format:
@@ -42,12 +44,9 @@ def _get_reqs_from_file(name):
         return _get_reqs_from_filelike(f)
 
 def _get_reqs_from_url(url):
-    try:
-        f = urllib2.urlopen(url)
+    with closing(urllib2.urlopen(url)) as f:
         print "Reading requirements from URL: %s" % f.geturl()
         return _get_reqs_from_filelike(f)
-    finally:
-        f.close()
     
 def add_reqs(argv=None, default_flink=None):
     if argv is None:
@@ -71,16 +70,21 @@ def add_reqs(argv=None, default_flink=None):
             print "'%s' does not specify a valid requirements file or url: %s" % (entry, str(err))
             sys.exit(-1)
 
+    # group requirements by find-links server so that each group can be
+    # installed by a single easy_install process
+    groups = OrderedDict()
     for req, flink in reqs:
         if flink is None:
-            if options.flink is None:
-                cmd = []
-            else:
-                cmd = ['-f', options.flink]
+            flink = options.flink
+        groups.setdefault(flink, []).append(req)
+
+    for flink, group in groups.items():
+        if flink is None:
+            cmd = []
         else:
             cmd = ['-f', flink]
         subprocess.check_call([os.path.join(os.path.dirname(sys.executable),
-                                            'easy_install'),'-NZ'] + cmd + [req])
+                                            'easy_install'),'-NZ'] + cmd + group)
 
    
 if __name__ == "__main__": # pragma no cover